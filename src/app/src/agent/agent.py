@@ -1,80 +1,129 @@
 """Main agent class for handling interactions with AWS Bedrock agent."""
 
+from __future__ import annotations
+
 import os
-from typing import Any, Dict, List, Optional, cast
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import boto3
 from boto3.session import Session
+from botocore.config import Config
 from core.session import SessionManager
 from langfuse import Langfuse
-from mypy_boto3_bedrock.client import BedrockClient
-from mypy_boto3_bedrock_agent_runtime.client import AgentsforBedrockRuntimeClient
-from mypy_boto3_bedrock_agent_runtime.type_defs import (
-    InputFileTypeDef,
-    ResponseStreamTypeDef,
-    SessionStateTypeDef,
-)
 
 from .handlers import (
-    display_html_files,
-    display_images,
-    get_html_files,
-    get_images,
+    collect_media,
     handle_citations,
     make_fully_cited_answer,
     process_trace_event,
 )
 from .types import AgentStats
 
+if TYPE_CHECKING:
+    from mypy_boto3_bedrock.client import BedrockClient
+    from mypy_boto3_bedrock_agent_runtime.client import AgentsforBedrockRuntimeClient
+    from mypy_boto3_bedrock_agent_runtime.type_defs import (
+        CitationTypeDef,
+        InputFileTypeDef,
+        ResponseStreamTypeDef,
+        SessionStateTypeDef,
+    )
+
+_BEDROCK_REGION = os.getenv("BEDROCK_REGION", "us-east-1")
+_MEDIA_TYPE_MAP = {
+    "pdf": "application/pdf",
+    "html": "text/html",
+}
+_STREAM_END = object()
+
+
+def _read_stream(event_stream: Iterable[Any], event_queue: queue.Queue) -> None:
+    """Drain the event stream into the queue, forwarding any error to the consumer."""
+    try:
+        for event in event_stream:
+            event_queue.put(event)
+    except Exception as ex:
+        event_queue.put(ex)
+    finally:
+        event_queue.put(_STREAM_END)
+
+
+def _iter_in_background(event_stream: Iterable[Any]) -> Iterator[Any]:
+    """Read the event stream on a background thread so rendering does not stall the network reads."""
+    event_queue: queue.Queue = queue.Queue()
+    threading.Thread(target=_read_stream, args=(event_stream, event_queue), daemon=True).start()
+    while (item := event_queue.get()) is not _STREAM_END:
+        if isinstance(item, Exception):
+            raise item
+        yield item
+
 
 class Agent:
     """Main agent class for handling interactions with AWS Bedrock agent."""
 
     def __init__(self, langfuse: Langfuse) -> None:
         """Initialize the agent with AWS Bedrock and Langfuse clients."""
-        self.session: Session = boto3.session.Session(region_name=os.getenv("BEDROCK_REGION", "us-east-1"))
-        self.bedrock_agent: BedrockClient = self.session.client("bedrock-agent")
-        self.bedrock_agent_runtime: AgentsforBedrockRuntimeClient = self.session.client("bedrock-agent-runtime")
-        self.agent_id: str = os.getenv("SUPERVISOR_AGENT_ID")
-        self.agent_alias_id: str = os.getenv("SUPERVISOR_AGENT_ALIAS_ID")
+        self.session: Session = boto3.session.Session(region_name=_BEDROCK_REGION)
+        self.client_config = Config(
+            tcp_keepalive=True,
+            max_pool_connections=int(os.getenv("BEDROCK_POOL", "32")),
+            retries={"max_attempts": 3, "mode": "standard"},
+            connect_timeout=3,
+            read_timeout=300,
+        )
+        self.bedrock_agent_runtime: AgentsforBedrockRuntimeClient = self.session.client(
+            "bedrock-agent-runtime", config=self.client_config
+        )
+        self.agent_id: str = os.getenv("SUPERVISOR_AGENT_ID", "")
+        self.agent_alias_id: str = os.getenv("SUPERVISOR_AGENT_ALIAS_ID", "")
+        if not self.agent_id or not self.agent_alias_id:
+            raise ValueError("SUPERVISOR_AGENT_ID and SUPERVISOR_AGENT_ALIAS_ID must be set")
         self.langfuse = langfuse
+        self._agent_name_cache: Dict[str, str] = {}
+        self._enforce_flush: bool = os.getenv("LANGFUSE_ENFORCE_FLUSH", "0") == "1"
+        self._render_traces: bool = os.getenv("RENDER_TRACES", "1") == "1"
+
+    @cached_property
+    def bedrock_agent(self) -> BedrockClient:
+        """Get the Bedrock agent client, created on first use for sub-agent lookups."""
+        return self.session.client("bedrock-agent", config=self.client_config)
 
     def _concat_messages(self, messages: List[Dict[str, Any]]) -> str:
         """Concatenate all session messages into a single string."""
-        return "\n\n".join(f"role:{m['role']} content:{m['content']}" for m in messages)
+        return "\n\n".join(["role:%s content:%s" % (m["role"], m["content"]) for m in messages])
+
+    def _prep_one_file(self, idx_file: Tuple[int, Any]) -> InputFileTypeDef:
+        """Convert a single uploaded file to the session state input file format."""
+        idx, file = idx_file
+        file_extension = file.name.split(".")[-1].lower()
+        return {
+            "name": f"input_{idx}.{file_extension}",
+            "source": {
+                "sourceType": "BYTE_CONTENT",
+                "byteContent": {
+                    "mediaType": _MEDIA_TYPE_MAP[file_extension],
+                    "data": file.getvalue(),
+                },
+            },
+            "useCase": "CHAT",
+        }
 
     def _get_file_session_state(self, uploaded_files) -> SessionStateTypeDef:
         """Convert uploaded files to session state format."""
         if not uploaded_files:
-            return SessionStateTypeDef()
+            return {}
 
-        media_type_map = {
-            "pdf": "application/pdf",
-            "html": "text/html",
-        }
+        supported_files = [f for f in uploaded_files if f.name.split(".")[-1].lower() in _MEDIA_TYPE_MAP]
+        if not supported_files:
+            return {"files": []}
 
-        files: List[InputFileTypeDef] = []
-        file_counter = 0
-        for file in uploaded_files:
-            file_extension = file.name.split(".")[-1].lower()
-            if file_extension not in media_type_map:
-                continue
-
-            files.append(
-                InputFileTypeDef(
-                    name=f"input_{file_counter}.{file_extension}",
-                    source={
-                        "sourceType": "BYTE_CONTENT",
-                        "byteContent": {
-                            "mediaType": media_type_map[file_extension],
-                            "data": file.getvalue(),
-                        },
-                    },
-                    useCase="CHAT",
-                )
-            )
-            file_counter += 1
-        return SessionStateTypeDef(files=files)
+        with ThreadPoolExecutor(max_workers=min(8, len(supported_files))) as executor:
+            files: List[InputFileTypeDef] = list(executor.map(self._prep_one_file, enumerate(supported_files)))
+        return {"files": files}
 
     def invoke_agent(
         self,
@@ -88,8 +137,10 @@ class Agent:
         """Invoke the Bedrock agent with the given messages and context."""
         stats = AgentStats()
         output_text = "Unfortunately, I'm not able to answer that question."
-        image_files = []
-        html_files = []
+        image_files: Dict[str, Dict[str, Any]] = {}
+        html_files: Dict[str, Dict[str, Any]] = {}
+        answer_parts: List[str] = []
+        answer_citations: List[CitationTypeDef] = []
 
         input_text = self._concat_messages(messages)
         session_state = self._get_file_session_state(uploaded_files)
@@ -113,47 +164,55 @@ class Agent:
             agentId=self.agent_id,
             agentAliasId=self.agent_alias_id,
             sessionId=session_id,
-            enableTrace=True,
+            enableTrace=self._render_traces,
             sessionState=session_state,
         )
 
-        for raw_event in response.get("completion", []):
-            event = cast(ResponseStreamTypeDef, raw_event)
-
+        event: ResponseStreamTypeDef
+        for event in _iter_in_background(response["completion"]):
             if "chunk" in event:
                 chunk = event["chunk"]
 
                 if attribution := chunk.get("attribution"):
                     citations = attribution.get("citations", [])
                     handle_citations(citations, langfuse_span)
+                    answer_citations.extend(citations)
 
                 if bytes_data := chunk.get("bytes"):
-                    output_text = bytes_data.decode("utf-8")
-                    output_text = make_fully_cited_answer(output_text, event)
+                    answer_parts.append(bytes_data.decode("utf-8"))
 
             if "files" in event:
-                new_images = get_images(event["files"])
-                image_files.extend(new_images)
-                new_html = get_html_files(event["files"])
-                html_files.extend(new_html)
+                collect_media(event["files"], image_files, html_files)
 
-            if "trace" in event:
+            if self._render_traces and "trace" in event:
                 trace = event["trace"]["trace"]
                 trace_part = event["trace"]
-                process_trace_event(trace, stats, trace_part, langfuse_span)
-
-        processed_images = display_images(image_files)
-        processed_html = display_html_files(html_files)
-
-        langfuse_span.generation(
-            name="agent-costs",
-            model="claude-3-5-sonnet-20240620",
-            usage_details={"input": stats.input_tokens, "output": stats.output_tokens},
-        )
+                process_trace_event(trace, stats, trace_part, langfuse_span, self.bedrock_agent, self._agent_name_cache)
+
+        if answer_parts:
+            output_text = make_fully_cited_answer("".join(answer_parts), answer_citations)
+
+        processed_images = list(image_files.values())
+        # Decode each HTML file once after the stream so reruns render the stored string directly
+        processed_html = [
+            {"name": html_file["name"], "content": html_file["content_bytes"].decode("utf-8", "replace")}
+            for html_file in html_files.values()
+        ]
+
+        # Token usage is only reported through trace events
+        if self._render_traces:
+            langfuse_span.generation(
+                name="agent-costs",
+                model="claude-3-5-sonnet-20240620",
+                usage_details={"input": stats.input_tokens, "output": stats.output_tokens},
+            )
+        # The answer is ingested once on the trace, ending the span only records its end time
         langfuse_span.end()
+        langfuse_trace.update(output=output_text)
 
-        self.langfuse.trace(id=langfuse_trace.id, output=output_text)
-        self.langfuse.flush()
+        # Langfuse batches events in the background, only flush explicitly for short-lived processes
+        if self._enforce_flush:
+            threading.Thread(target=self.langfuse.flush, daemon=True).start()
 
         session_manager.add_assistant_message(output_text, trace_id, processed_images, processed_html)
         return output_text
@@ -1,25 +1,49 @@
 """Handlers for processing agent traces and events."""
 
+from __future__ import annotations
+
 import json
-import math
-import os
 import re
-from typing import Any, Dict, List, Optional, Union, cast
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, Union
 
-import boto3
 import streamlit as st
-from mypy_boto3_bedrock_agent_runtime.type_defs import (
-    CitationTypeDef,
-    FilePartTypeDef,
-    OutputFileTypeDef,
-    ResponseStreamTypeDef,
-    RetrievedReferenceTypeDef,
-    TracePartTypeDef,
-    TraceTypeDef,
-)
 
 from .types import AgentStats
 
+if TYPE_CHECKING:
+    from mypy_boto3_bedrock_agent_runtime.type_defs import (
+        CitationTypeDef,
+        FilePartTypeDef,
+        RetrievedReferenceTypeDef,
+        TracePartTypeDef,
+        TraceTypeDef,
+    )
+
+_MD_DIVIDER = "\n\n---\n\n"
+_CITATION_STRIP_RE = re.compile(r"\n\n<sources>\n\d+\n</sources>\n\n|<sources><REDACTED></sources>|<sources></sources>")
+
+
+def _markdown_table(headers: Tuple[str, ...], rows: List[Tuple[Any, ...]]) -> str:
+    """Format rows as a markdown table, escaping pipes in cell values."""
+    lines = [
+        "| " + " | ".join(headers) + " |",
+        "|" + "---|" * len(headers),
+    ]
+    for row in rows:
+        lines.append("| " + " | ".join(str(cell).replace("|", "\\|").replace("\n", " ") for cell in row) + " |")
+    return "\n".join(lines)
+
+
+def _try_parse_json(text: str) -> Optional[Any]:
+    """Parse text as JSON, skipping the parser for text that cannot be a JSON object or array."""
+    stripped = text.lstrip()
+    if not stripped or stripped[0] not in "{[":
+        return None
+    try:
+        return json.loads(stripped)
+    except json.JSONDecodeError:
+        return None
+
 
 def handle_citations(citations: List[CitationTypeDef], langfuse_span) -> None:
     """Handle and display knowledge base citations."""
@@ -31,29 +55,24 @@ def handle_citations(citations: List[CitationTypeDef], langfuse_span) -> None:
         with st.expander("Knowledge Base", False):
             text = citation.get("generatedResponsePart", {}).get("textResponsePart", {}).get("text", "")
             if text:
-                st.write(text)
-                st.divider()
-                display_citation_references(retrieved_references, langfuse_span)
+                references_md = format_citation_references(retrieved_references, langfuse_span)
+                st.markdown(f"{text}{_MD_DIVIDER}{references_md}")
 
 
-def display_citation_references(references: List[RetrievedReferenceTypeDef], langfuse_span) -> None:
-    """Display knowledge base citation references."""
+def format_citation_references(references: List[RetrievedReferenceTypeDef], langfuse_span) -> str:
+    """Format knowledge base citation references as markdown."""
     if not references:
-        return
+        return ""
 
-    valid_uris = []
-    for ref in references:
-        if uri := get_reference_uri(ref):
-            valid_uris.append(uri)
+    valid_uris = sorted({uri for ref in references if (uri := get_reference_uri(ref))})
+    if not valid_uris:
+        return ""
 
-    if valid_uris:
-        st.write("References:")
-        for uri in sorted(set(valid_uris)):
-            st.write(f"- {uri}")
-        langfuse_span.event(
-            name="agent-citation-references",
-            metadata={"uri_list": valid_uris},
-        )
+    langfuse_span.event(
+        name="agent-citation-references",
+        metadata={"uri_list": valid_uris},
+    )
+    return "References:\n\n" + "\n".join(f"- {uri}" for uri in valid_uris)
 
 
 def get_reference_uri(reference: RetrievedReferenceTypeDef) -> Optional[str]:
@@ -73,11 +92,8 @@ def handle_tool_invocation(action_input: Dict[str, Any], langfuse_span) -> None:
         tool_name = action_input["apiPath"]
 
     with st.expander(f"Tool Invocation ({tool_name})", False):
-        param_data = {
-            "Parameter Name": [p["name"] for p in action_input["parameters"]],
-            "Parameter Value": [p["value"] for p in action_input["parameters"]],
-        }
-        st.table(param_data)
+        rows = [(p["name"], p["value"]) for p in action_input["parameters"]]
+        st.markdown(_markdown_table(("Parameter Name", "Parameter Value"), rows))
 
         langfuse_span.event(
             name="agent-tool-invocation",
@@ -128,28 +144,22 @@ def handle_knowledge_base_lookup(kb_input: Dict[str, Any], langfuse_span) -> Non
         )
 
 
+_INVOCATION_HANDLERS: Dict[str, Tuple[str, Callable[[Dict[str, Any], Any], None]]] = {
+    "AGENT_COLLABORATOR": ("agentCollaboratorInvocationInput", handle_agent_collaborator),
+    "ACTION_GROUP": ("actionGroupInvocationInput", handle_tool_invocation),
+    "KNOWLEDGE_BASE": ("knowledgeBaseLookupInput", handle_knowledge_base_lookup),
+}
+
+
 def handle_invocation_input(invocation_input: Dict[str, Any], langfuse_span) -> None:
     """Handle different types of invocation inputs."""
     invocation_type = invocation_input.get("invocationType")
     if not isinstance(invocation_type, str):
         return
 
-    handlers = {
-        "AGENT_COLLABORATOR": lambda: handle_agent_collaborator(
-            invocation_input.get("agentCollaboratorInvocationInput", {}),
-            langfuse_span,
-        ),
-        "ACTION_GROUP": lambda: handle_tool_invocation(
-            invocation_input.get("actionGroupInvocationInput", {}),
-            langfuse_span,
-        ),
-        "KNOWLEDGE_BASE": lambda: handle_knowledge_base_lookup(
-            invocation_input.get("knowledgeBaseLookupInput", {}),
-            langfuse_span,
-        ),
-    }
-    if handler := handlers.get(invocation_type):
-        handler()
+    if entry := _INVOCATION_HANDLERS.get(invocation_type):
+        input_key, handler = entry
+        handler(invocation_input.get(input_key, {}), langfuse_span)
 
 
 def handle_agent_collaborator_observation(output: Dict[str, Any], langfuse_span) -> None:
@@ -168,10 +178,9 @@ def handle_action_group_observation(output: Dict[str, Any], langfuse_span) -> No
     """Handle action group observation output."""
     with st.expander("Tool Response", False):
         text = output.get("actionGroupInvocationOutput", {}).get("text", "")
-        try:
-            json_data = json.loads(text)
+        if (json_data := _try_parse_json(text)) is not None:
             st.json(json_data)
-        except json.JSONDecodeError:
+        else:
             st.text(text)
         langfuse_span.event(
             name="agent-action-group-response",
@@ -182,10 +191,14 @@ def handle_action_group_observation(output: Dict[str, Any], langfuse_span) -> No
 def handle_knowledge_base_observation(kb_output: Dict[str, Any], langfuse_span) -> None:
     """Handle knowledge base observation output."""
     with st.expander("Knowledge Base Results", False):
-        for ref in kb_output.get("retrievedReferences", []):
-            st.write(f"Content: {ref.get('content', {}).get('text')}")
-            st.write(f"Source: {ref.get('location', {}).get('s3Location', {}).get('uri')}")
-            st.divider()
+        st.markdown(
+            "".join(
+                f"Content: {ref.get('content', {}).get('text')}\n\n"
+                f"Source: {ref.get('location', {}).get('s3Location', {}).get('uri')}"
+                f"{_MD_DIVIDER}"
+                for ref in kb_output.get("retrievedReferences", [])
+            )
+        )
         langfuse_span.event(
             name="agent-knowledge-base-response",
             metadata={"kb_output": kb_output},
@@ -195,40 +208,30 @@ def handle_knowledge_base_observation(kb_output: Dict[str, Any], langfuse_span)
 def handle_reprompt_observation(response: Dict[str, Any], langfuse_span) -> None:
     """Handle reprompt observation output."""
     with st.expander("Reprompt", True):
-        st.warning(f"Source: {response.get('source')}")
-        st.write(f"Message: {response.get('text')}")
+        st.warning(f"Source: {response.get('source')}\n\nMessage: {response.get('text')}")
         langfuse_span.event(
             name="agent-reprompt-response",
             metadata={"response": response},
         )
 
 
+_OBSERVATION_HANDLERS: Dict[str, Tuple[Optional[str], Callable[[Dict[str, Any], Any], None]]] = {
+    "AGENT_COLLABORATOR": ("agentCollaboratorInvocationOutput", handle_agent_collaborator_observation),
+    "ACTION_GROUP": (None, handle_action_group_observation),
+    "KNOWLEDGE_BASE": ("knowledgeBaseLookupOutput", handle_knowledge_base_observation),
+    "REPROMPT": ("repromptResponse", handle_reprompt_observation),
+}
+
+
 def handle_observation(observation: Dict[str, Any], langfuse_span) -> None:
     """Handle different types of observations."""
     observation_type = observation.get("type")
     if not isinstance(observation_type, str):
         return
 
-    handlers = {
-        "AGENT_COLLABORATOR": lambda: handle_agent_collaborator_observation(
-            observation.get("agentCollaboratorInvocationOutput", {}),
-            langfuse_span,
-        ),
-        "ACTION_GROUP": lambda: handle_action_group_observation(
-            observation,
-            langfuse_span,
-        ),
-        "KNOWLEDGE_BASE": lambda: handle_knowledge_base_observation(
-            observation.get("knowledgeBaseLookupOutput", {}),
-            langfuse_span,
-        ),
-        "REPROMPT": lambda: handle_reprompt_observation(
-            observation.get("repromptResponse", {}),
-            langfuse_span,
-        ),
-    }
-    if handler := handlers.get(observation_type):
-        handler()
+    if entry := _OBSERVATION_HANDLERS.get(observation_type):
+        output_key, handler = entry
+        handler(observation.get(output_key, {}) if output_key else observation, langfuse_span)
 
 
 def handle_reasoning_step(
@@ -240,18 +243,21 @@ def handle_reasoning_step(
 ) -> None:
     """Handle and display reasoning steps."""
     if chain_length <= 1:
-        stats.step_counter = math.floor(stats.step_counter + 1)
-        step_title = f"Supervisor Reasoning (Step {round(stats.step_counter, 2)})"
+        stats.supervisor_steps += 1
+        stats.sub_agent_steps = 0
+        step_number = str(stats.supervisor_steps)
+        step_title = f"Supervisor Reasoning (Step {step_number})"
     else:
-        stats.step_counter += 0.1
-        step_title = f"Sub-Agent Reasoning (Step {round(stats.step_counter, 2)}, Agent {agent_name})"
+        stats.sub_agent_steps += 1
+        step_number = f"{stats.supervisor_steps}.{stats.sub_agent_steps}"
+        step_title = f"Sub-Agent Reasoning (Step {step_number}, Agent {agent_name})"
 
     with st.expander(step_title, False):
         st.write(rationale_text)
         langfuse_span.event(
             name="agent-reasoning-step",
             metadata={
-                "step_number": stats.step_counter,
+                "step_number": step_number,
                 "agent_name": agent_name,
                 "rationale_text": rationale_text,
             },
@@ -271,9 +277,11 @@ def handle_preprocessing_trace(trace: Dict[str, Any], stats: AgentStats, langfus
     with st.expander("Preprocessing Step", False):
         output = trace["modelInvocationOutput"]
         if "parsedResponse" in output:
-            st.write("*Parsed Response*")
-            st.write(f"Valid Input: {output['parsedResponse']['isValid']}")
-            st.write(f"Rationale: {output['parsedResponse']['rationale']}")
+            st.markdown(
+                "*Parsed Response*\n\n"
+                f"Valid Input: {output['parsedResponse']['isValid']}\n\n"
+                f"Rationale: {output['parsedResponse']['rationale']}"
+            )
             langfuse_span.event(
                 name="agent-preprocessing-preprocessing-step",
                 metadata={"output": output},
@@ -321,8 +329,7 @@ def handle_postprocessing_trace(trace: Dict[str, Any], stats: AgentStats, langfu
         if "modelInvocationOutput" in trace:
             output = trace["modelInvocationOutput"]
             if "parsedResponse" in output:
-                st.write("*Final Response*")
-                st.write(output["parsedResponse"]["text"])
+                st.markdown(f"*Final Response*\n\n{output['parsedResponse']['text']}")
                 langfuse_span.event(
                     name="agent-postprocessing-postprocessing-step",
                     metadata={"output": output},
@@ -343,154 +350,104 @@ def handle_failure_trace(trace: Dict[str, Any], langfuse_span) -> None:
         )
 
 
-def handle_policy_assessments(assessment: Dict[str, Any], langfuse_span) -> None:
-    """Handle and display policy assessments."""
+def format_policy_assessments(assessment: Dict[str, Any], langfuse_span) -> List[str]:
+    """Format policy assessments as markdown blocks."""
+    blocks: List[str] = []
     if "topicPolicy" in assessment:
-        st.write("Topic Policy:")
+        blocks.append("Topic Policy:")
         for topic in assessment["topicPolicy"].get("topics", []):
-            st.write(f"- {topic['name']} ({topic['type']}): {topic['action']}")
+            blocks.append(f"- {topic['name']} ({topic['type']}): {topic['action']}")
 
     if "contentPolicy" in assessment:
-        st.write("Content Policy:")
+        blocks.append("Content Policy:")
         for filter in assessment["contentPolicy"].get("filters", []):
-            st.write(f"- {filter['type']} ({filter['confidence']}): {filter['action']}")
+            blocks.append(f"- {filter['type']} ({filter['confidence']}): {filter['action']}")
 
     if "wordPolicy" in assessment:
-        st.write("Word Policy:")
+        blocks.append("Word Policy:")
         for word in assessment["wordPolicy"].get("customWords", []):
-            st.write(f"- {word['match']}: {word['action']}")
+            blocks.append(f"- {word['match']}: {word['action']}")
         for word_list in assessment["wordPolicy"].get("managedWordLists", []):
-            st.write(f"- {word_list['type']} ({word_list['match']}): {word_list['action']}")
+            blocks.append(f"- {word_list['type']} ({word_list['match']}): {word_list['action']}")
 
     if "sensitiveInformationPolicy" in assessment:
-        st.write("Sensitive Information Policy:")
+        blocks.append("Sensitive Information Policy:")
         for entity in assessment["sensitiveInformationPolicy"].get("piiEntities", []):
-            st.write(f"- {entity['type']} ({entity['match']}): {entity['action']}")
+            blocks.append(f"- {entity['type']} ({entity['match']}): {entity['action']}")
         for regex in assessment["sensitiveInformationPolicy"].get("regexes", []):
-            st.write(f"- {regex['name']}: {regex['action']}")
+            blocks.append(f"- {regex['name']}: {regex['action']}")
 
     langfuse_span.event(
         name="agent-policy-assessments",
         metadata={"assessment": assessment},
     )
+    return blocks
 
 
 def handle_guardrail_trace(trace: Dict[str, Any], langfuse_span) -> None:
     """Handle and display guardrail trace information."""
     with st.expander("Guardrail Assessment", False):
         action = trace.get("action", "NONE")
-        st.write(f"Action: {action}")
+        blocks = [f"Action: {action}"]
 
         for assessment_type in ["inputAssessments", "outputAssessments"]:
             assessments = trace.get(assessment_type, [])
             if assessments:
-                st.write(f"\n*{assessment_type}*")
+                blocks.append(f"*{assessment_type}*")
                 for assessment in assessments:
-                    handle_policy_assessments(assessment, langfuse_span)
+                    blocks.extend(format_policy_assessments(assessment, langfuse_span))
+
+        st.markdown("\n\n".join(blocks))
 
 
 def handle_routing_classifier_output(routing_output: Dict[str, Any], langfuse_span) -> None:
     """Handle and display routing classifier output."""
     with st.expander("Routing Decision", False):
-        st.write(f"Raw Response: {routing_output.get('rawResponse')}")
-        st.write("*Routing Metadata*")
         metadata = routing_output.get("metadata", {})
-        st.write(f"Input Tokens: {metadata.get('inputTokens')}")
-        st.write(f"Output Tokens: {metadata.get('outputTokens')}")
+        st.markdown(
+            f"Raw Response: {routing_output.get('rawResponse')}\n\n"
+            "*Routing Metadata*\n\n"
+            f"Input Tokens: {metadata.get('inputTokens')}\n\n"
+            f"Output Tokens: {metadata.get('outputTokens')}"
+        )
         if parsed_response := routing_output.get("routerClassifierParsedResponse"):
-            st.write("\n*Parsed Routing Response*")
-            st.write(parsed_response)
+            st.write("*Parsed Routing Response*", parsed_response)
         langfuse_span.event(
             name="agent-routing-classifier-output",
             metadata={"routing_output": routing_output},
         )
 
 
-def get_images(files_event: FilePartTypeDef) -> List[OutputFileTypeDef]:
-    """Extract image files from the files event."""
-    files_list = files_event.get("files", [])
-    if not files_list:
-        return []
-
-    return [f for f in files_list if f.get("type", "").startswith("image/")]
-
-
-def display_images(image_files: List[OutputFileTypeDef]) -> List[Dict[str, Any]]:
-    """Process and store image files for display.
-
-    Returns a list of image data dictionaries that can be stored in session state.
-    """
-    if not image_files:
-        return []
-
-    processed_images = []
-    unique_images: Dict[str, OutputFileTypeDef] = {}
-    for file in image_files:
-        if filename := file.get("name"):
-            unique_images[filename] = file
-
-    for file in unique_images.values():
-        image_bytes = file.get("bytes")
-        if isinstance(image_bytes, bytes):
-            try:
-                processed_images.append({"name": file.get("name", ""), "bytes": image_bytes})
-            except Exception as e:
-                st.error(f"Failed to process image {file.get('name', '')}: {str(e)}")
-
-    return processed_images
-
-
-def get_html_files(files_event: FilePartTypeDef) -> List[OutputFileTypeDef]:
-    """Extract HTML files from the files event."""
-    files_list = files_event.get("files", [])
-    if not files_list:
-        return []
-
-    return [f for f in files_list if f.get("type", "") == "text/html"]
-
-
-def display_html_files(html_files: List[OutputFileTypeDef]) -> List[Dict[str, Any]]:
-    """Process and store HTML files for display.
+def collect_media(
+    files_event: FilePartTypeDef,
+    image_acc: Dict[str, Dict[str, Any]],
+    html_acc: Dict[str, Dict[str, Any]],
+) -> None:
+    """Classify the files of a files event into images and HTML files.
 
-    Returns a list of HTML data dictionaries that can be stored in session state.
+    Files are deduplicated by name into the given accumulators, which can later be stored in session state.
     """
-    if not html_files:
-        return []
-
-    processed_html = []
-    unique_html: Dict[str, OutputFileTypeDef] = {}
-    for file in html_files:
-        if filename := file.get("name"):
-            unique_html[filename] = file
-
-    for file in unique_html.values():
-        html_bytes = file.get("bytes")
-        if isinstance(html_bytes, bytes):
-            try:
-                html_content = html_bytes.decode("utf-8")
-                processed_html.append({"name": file.get("name", ""), "content": html_content})
-            except Exception as e:
-                st.error(f"Failed to process HTML {file.get('name', '')}: {str(e)}")
+    for file in files_event.get("files", []):
+        filename = file.get("name")
+        file_bytes = file.get("bytes")
+        if not filename or not isinstance(file_bytes, bytes):
+            continue
 
-    return processed_html
+        file_type = file.get("type", "")
+        if file_type.startswith("image/"):
+            image_acc[filename] = {"name": filename, "bytes": file_bytes}
+        elif file_type == "text/html":
+            html_acc[filename] = {"name": filename, "content_bytes": file_bytes}
 
 
-def make_fully_cited_answer(orig_answer: str, event: ResponseStreamTypeDef) -> str:
+def make_fully_cited_answer(orig_answer: str, citations: List[CitationTypeDef]) -> str:
     """Process the answer to include citations."""
-    citations = event.get("chunk", {}).get("attribution", {}).get("citations", [])
     if not citations:
         return orig_answer
 
-    patterns = [
-        r"\n\n<sources>\n\d+\n</sources>\n\n",
-        "<sources><REDACTED></sources>",
-        "<sources></sources>",
-    ]
-    cleaned_text = orig_answer
-    for pattern in patterns:
-        cleaned_text = re.sub(pattern, "", cleaned_text)
+    cleaned_text = _CITATION_STRIP_RE.sub("", orig_answer)
 
-    fully_cited_answer = ""
+    answer_parts: List[str] = []
     curr_citation_idx = 0
     for citation in citations:
         start = citation["generatedResponsePart"]["textResponsePart"]["span"]["start"] - (curr_citation_idx + 1)
@@ -502,17 +459,13 @@ def make_fully_cited_answer(orig_answer: str, event: ResponseStreamTypeDef) -> s
         if not ref_url:
             return cleaned_text
 
-        cited_text = cleaned_text[start:end] + " [" + ref_url + "] "
-
         if curr_citation_idx == 0:
-            answer_prefix = cleaned_text[:start]
-            fully_cited_answer = answer_prefix + cited_text
-        else:
-            fully_cited_answer += cited_text
+            answer_parts.append(cleaned_text[:start])
+        answer_parts.append(cleaned_text[start:end] + " [" + ref_url + "] ")
 
         curr_citation_idx += 1
 
-    return fully_cited_answer
+    return "".join(answer_parts)
 
 
 def handle_routing_classifier_trace(trace: Dict[str, Any], stats: AgentStats, langfuse_span) -> None:
@@ -527,8 +480,12 @@ def handle_routing_classifier_trace(trace: Dict[str, Any], stats: AgentStats, la
                 update_stats_from_usage(output["metadata"]["usage"], stats)
 
             if "rawResponse" in output:
+                raw_resp = _try_parse_json(output["rawResponse"]["content"])
+                if not isinstance(raw_resp, dict):
+                    st.write("Could not parse routing classification response")
+                    return
+
                 try:
-                    raw_resp = json.loads(output["rawResponse"]["content"])
                     classification = raw_resp.get("content", [{}])[0].get("text", "")
                     classification = classification.replace("<a>", "").replace("</a>", "")
                     st.write(f"Classification Result: {classification}")
@@ -536,7 +493,7 @@ def handle_routing_classifier_trace(trace: Dict[str, Any], stats: AgentStats, la
                         name="agent-routing-classifier-output",
                         metadata={"classification": classification},
                     )
-                except (json.JSONDecodeError, KeyError, IndexError):
+                except (KeyError, IndexError):
                     st.write("Could not parse routing classification response")
 
 
@@ -551,16 +508,42 @@ def handle_code_interpreter(input_data: Dict[str, Any], langfuse_span) -> None:
             st.code(code, language="python")
 
 
+def get_agent_name(sub_agent_id: str, bedrock_agent, agent_name_cache: Dict[str, str]) -> str:
+    """Get the name of a sub-agent, looking it up only once per agent ID."""
+    agent_name = agent_name_cache.get(sub_agent_id)
+    if agent_name is None:
+        agent_name = bedrock_agent.get_agent(agentId=sub_agent_id)["agent"]["agentName"]
+        agent_name_cache[sub_agent_id] = agent_name
+    return agent_name
+
+
+_TRACE_HANDLERS: Dict[str, Callable[[Dict[str, Any], AgentStats, Any, Dict[str, Any], str], None]] = {
+    "routingClassifierTrace": lambda trace, stats, span, event_trace, agent_name: handle_routing_classifier_trace(
+        trace, stats, span
+    ),
+    "failureTrace": lambda trace, stats, span, event_trace, agent_name: handle_failure_trace(trace, span),
+    "guardrailTrace": lambda trace, stats, span, event_trace, agent_name: handle_guardrail_trace(trace, span),
+    "preProcessingTrace": lambda trace, stats, span, event_trace, agent_name: handle_preprocessing_trace(
+        trace, stats, span
+    ),
+    "orchestrationTrace": lambda trace, stats, span, event_trace, agent_name: handle_orchestration_trace(
+        trace, event_trace, agent_name, stats, span
+    ),
+    "postProcessingTrace": lambda trace, stats, span, event_trace, agent_name: handle_postprocessing_trace(
+        trace, stats, span
+    ),
+}
+
+
 def process_trace_event(
-    trace_obj: Union[TraceTypeDef, Dict[str, Any]],
+    trace_dict: Union[TraceTypeDef, Dict[str, Any]],
     stats: AgentStats,
-    event_trace: Union[TracePartTypeDef, Dict[str, Any]],
+    event_trace_dict: Union[TracePartTypeDef, Dict[str, Any]],
     langfuse_span,
+    bedrock_agent,
+    agent_name_cache: Dict[str, str],
 ) -> None:
     """Process and handle trace events."""
-    trace_dict = cast(Dict[str, Any], trace_obj)
-    event_trace_dict = cast(Dict[str, Any], event_trace)
-
     agent_name = "Supervisor"
     if "callerChain" in event_trace_dict:
         chain = event_trace_dict["callerChain"]
@@ -569,35 +552,10 @@ def process_trace_event(
             sub_agent_id = sub_agent_alias_arn.split("/")[1] if sub_agent_alias_arn else None
             if sub_agent_id:
                 try:
-                    agent_name = (
-                        boto3.client("bedrock-agent", region_name=os.getenv("BEDROCK_REGION", "us-east-1"))
-                        .get_agent(agentId=sub_agent_id)
-                        .get("agent")
-                        .get("agentName")
-                    )
+                    agent_name = get_agent_name(sub_agent_id, bedrock_agent, agent_name_cache)
                 except Exception as ex:
                     st.error(f"Failed to get agent name for sub-agent {sub_agent_id}: {str(ex)}")
 
-    if "routingClassifierTrace" in trace_dict:
-        handle_routing_classifier_trace(trace_dict["routingClassifierTrace"], stats, langfuse_span)
-
-    if "failureTrace" in trace_dict:
-        handle_failure_trace(trace_dict["failureTrace"], langfuse_span)
-
-    if "guardrailTrace" in trace_dict:
-        handle_guardrail_trace(trace_dict["guardrailTrace"], langfuse_span)
-
-    if "preProcessingTrace" in trace_dict:
-        handle_preprocessing_trace(trace_dict["preProcessingTrace"], stats, langfuse_span)
-
-    elif "orchestrationTrace" in trace_dict:
-        handle_orchestration_trace(
-            trace_dict["orchestrationTrace"],
-            event_trace_dict,
-            agent_name,
-            stats,
-            langfuse_span,
-        )
-
-    elif "postProcessingTrace" in trace_dict:
-        handle_postprocessing_trace(trace_dict["postProcessingTrace"], stats, langfuse_span)
+    for trace_type, trace in trace_dict.items():
+        if handler := _TRACE_HANDLERS.get(trace_type):
+            handler(trace, stats, langfuse_span, event_trace_dict, agent_name)  # type: ignore[arg-type]
@@ -9,4 +9,5 @@ class AgentStats:
 
     input_tokens: int = 0
     output_tokens: int = 0
-    step_counter: float = 0
+    supervisor_steps: int = 0
+    sub_agent_steps: int = 0
@@ -1,8 +1,6 @@
 """Main application module for the agentic chatbot interface."""
 
-import asyncio
 import os
-from io import BytesIO
 from typing import Optional
 
 import streamlit as st
@@ -14,8 +12,30 @@ from core.auth import Auth
 from core.langfuse_client import create_langfuse_client
 from core.s3 import S3Handler
 from core.session import SessionManager
+from langfuse import Langfuse
 from streamlit.runtime.scriptrunner import get_script_run_ctx
 
+# Wrapper div and script to resize the component iframe to the height of the content
+_HTML_WRAPPER = """
+<div id="html-wrapper" style="min-height: 250px;">
+    {content}
+</div>
+<script>
+    // Wait for the content to load
+    window.addEventListener('load', function() {{
+        // Get the wrapper element
+        var wrapper = document.getElementById('html-wrapper');
+        // Get the actual height of the content
+        var height = Math.max(250, wrapper.scrollHeight);
+        // Set the iframe height through Streamlit
+        window.parent.postMessage({{
+            type: 'streamlit:setFrameHeight',
+            height: height
+        }}, '*');
+    }});
+</script>
+"""
+
 
 def display_message_images(images: list) -> None:
     """Display images associated with a message."""
@@ -23,12 +43,13 @@ def display_message_images(images: list) -> None:
         return
 
     with st.expander("Generated Images", True):
-        for image in images:
-            try:
-                image_data = BytesIO(image["bytes"])
-                st.image(image_data, caption=image.get("name", ""))
-            except Exception as e:
-                st.error(f"Failed to display image {image.get('name', '')}: {str(e)}")
+        try:
+            st.image(
+                [image["bytes"] for image in images],
+                caption=[image.get("name", "") for image in images],
+            )
+        except Exception as e:
+            st.error(f"Failed to display images: {str(e)}")
 
 
 def display_message_html(html_files: list) -> None:
@@ -37,35 +58,29 @@ def display_message_html(html_files: list) -> None:
         return
 
     with st.expander("Generated HTML", True):
+        # Each file is a full HTML document, so every file gets its own isolated iframe
         for html_file in html_files:
             try:
                 st.markdown(f"**{html_file.get('name', '')}**")
-                # Add wrapper div and script to calculate height
-                wrapped_content = f"""
-                    <div id="html-wrapper" style="min-height: 250px;">
-                        {html_file["content"]}
-                    </div>
-                    <script>
-                        // Wait for the content to load
-                        window.addEventListener('load', function() {{
-                            // Get the wrapper element
-                            var wrapper = document.getElementById('html-wrapper');
-                            // Get the actual height of the content
-                            var height = Math.max(250, wrapper.scrollHeight);
-                            // Set the iframe height through Streamlit
-                            window.parent.postMessage({{
-                                type: 'streamlit:setFrameHeight',
-                                height: height
-                            }}, '*');
-                        }});
-                    </script>
-                """
+                wrapped_content = _HTML_WRAPPER.format(content=html_file["content"])
                 st.components.v1.html(wrapped_content, scrolling=True, height=250)
             except Exception as e:
                 st.error(f"Failed to display HTML {html_file.get('name', '')}: {str(e)}")
 
 
-async def initialize_session(auth: Optional[Auth] = None) -> str:
+@st.cache_resource
+def get_agent(_langfuse: Langfuse) -> Agent:
+    """Get the agent shared across all sessions, the Langfuse client is excluded from hashing."""
+    return Agent(langfuse=_langfuse)
+
+
+@st.cache_resource
+def get_s3_handler() -> S3Handler:
+    """Get the S3 handler shared across all sessions."""
+    return S3Handler()
+
+
+def initialize_session(auth: Optional[Auth] = None) -> str:
     """Initialize the user session and handle authentication."""
     if os.getenv("RUNTIME_ENV") == "local":
         return "Local User"
@@ -79,7 +94,7 @@ async def initialize_session(auth: Optional[Auth] = None) -> str:
     return authenticator.get_username()
 
 
-async def handle_chat_interaction(
+def handle_chat_interaction(
     agent: Agent,
     username: str,
     session_manager: SessionManager,
@@ -103,14 +118,15 @@ async def handle_chat_interaction(
                     trace_id=trace_id,
                 )
             st.write(response)
-            display_message_images(session_manager.get_message_images(trace_id))
-            display_message_html(session_manager.get_message_html(trace_id))
+            images, html_files = session_manager.get_assistant_attachments(trace_id)
+            display_message_images(images)
+            display_message_html(html_files)
             render_feedback_ui(trace_id, session_manager)
         except Exception as ex:
             st.error(f"Something went wrong: {str(ex)}")
 
 
-async def main() -> None:
+def main() -> None:
     """Main application entry point.
 
     Sets up the Streamlit interface, initializes core services,
@@ -124,39 +140,36 @@ async def main() -> None:
 
     apply_custom_style()
 
-    if st.get_option("client.toolbarMode") != "minimal":
-        st.set_option("client.toolbarMode", "minimal")
-        await asyncio.sleep(0.1)
-        st.rerun()
-
     # Initialize core services
     session_manager = SessionManager(
         session_id=get_script_run_ctx().session_id,  # type: ignore
         langfuse=create_langfuse_client(),
     )
-    agent = Agent(langfuse=session_manager.langfuse)
-    s3_handler = S3Handler()
+    agent = get_agent(session_manager.langfuse)
+    s3_handler = get_s3_handler()
 
     # Initialize session and auth
-    username = await initialize_session()
+    username = initialize_session()
 
     # Render UI components
     render_sidebar(username, session_manager, s3_handler)
 
-    # Display chat history
-    for message in session_manager.messages:
-        with st.chat_message(message["role"]):
-            st.markdown(message["content"])
-            if message["role"] == "assistant":
-                if "trace_id" in message:
-                    display_message_images(session_manager.get_message_images(message["trace_id"]))
-                    display_message_html(session_manager.get_message_html(message["trace_id"]))
-                    render_feedback_ui(message["trace_id"], session_manager)
+    # Display chat history, only the most recent messages are rendered
+    if session_manager.has_hidden_messages:
+        st.button("Load earlier messages", on_click=session_manager.expand_history_window)
+    for role, content, trace_id in session_manager.visible_messages:
+        with st.chat_message(role):
+            st.markdown(content)
+            if role == "assistant" and trace_id:
+                images, html_files = session_manager.get_assistant_attachments(trace_id)
+                display_message_images(images)
+                display_message_html(html_files)
+                render_feedback_ui(trace_id, session_manager)
 
     # Handle new chat input
     if prompt := st.chat_input("How can I help you today?"):
-        await handle_chat_interaction(agent, username, session_manager, prompt)
+        handle_chat_interaction(agent, username, session_manager, prompt)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    main()
@@ -2,26 +2,28 @@
 
 import streamlit as st
 
+_CUSTOM_CSS = """
+<style>
+[data-testid="stStatusWidget"] {
+    visibility: hidden;
+    height: 0%;
+    position: fixed;
+}
+.file-link {
+    text-decoration: none;
+    color: #1E88E5;
+    cursor: pointer;
+}
+.file-link:hover {
+    text-decoration: underline;
+}
+</style>
+"""
+
 
 def apply_custom_style() -> None:
-    """Apply custom CSS styles to the application."""
-    st.markdown(
-        """
-        <style>
-        [data-testid="stStatusWidget"] {
-            visibility: hidden;
-            height: 0%;
-            position: fixed;
-        }
-        .file-link {
-            text-decoration: none;
-            color: #1E88E5;
-            cursor: pointer;
-        }
-        .file-link:hover {
-            text-decoration: underline;
-        }
-        </style>
-    """,
-        unsafe_allow_html=True,
-    )
+    """Apply custom CSS styles to the application.
+
+    The style element has to be emitted on every run, Streamlit removes elements that a rerun does not render again.
+    """
+    st.markdown(_CUSTOM_CSS, unsafe_allow_html=True)
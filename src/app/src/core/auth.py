@@ -2,18 +2,28 @@
 
 import os
 
+import boto3
+import streamlit as st
 from streamlit_cognito_auth import CognitoAuthenticator
 
 
+@st.cache_resource
+def _get_cognito_client(region: str):
+    """Get a Cognito identity provider client shared across all sessions."""
+    return boto3.client("cognito-idp", region_name=region)
+
+
 class Auth:
     """Authentication handler for AWS Cognito integration."""
 
     def __init__(self) -> None:
         """Initialize the authentication handler with Cognito configuration."""
+        pool_id = os.getenv("USER_POOL_ID", "")
         authenticator = CognitoAuthenticator(
-            pool_id=os.getenv("USER_POOL_ID"),
+            pool_id=pool_id,
             app_client_id=os.getenv("USER_POOL_CLIENT_ID"),
             app_client_secret=os.getenv("USER_POOL_CLIENT_SECRET"),
+            boto_client=_get_cognito_client(pool_id.split("_")[0]),
         )
         self.authenticator = authenticator
 
@@ -2,13 +2,21 @@
 
 import os
 
+import streamlit as st
 from langfuse import Langfuse
 
 
+@st.cache_resource
 def create_langfuse_client() -> Langfuse:
-    """Create and initialize a Langfuse client."""
+    """Create and initialize a Langfuse client, shared across all sessions of the process.
+
+    Events are batched by the SDK and sent once `flush_at` events are queued
+    or `flush_interval` seconds have passed, whichever comes first.
+    """
     return Langfuse(
         public_key=os.getenv("LANGFUSE_PUBLIC_KEY"),
         secret_key=os.getenv("LANGFUSE_SECRET_KEY"),
         host="https://cloud.langfuse.com",
+        flush_at=int(os.getenv("LANGFUSE_FLUSH_AT", "50")),
+        flush_interval=float(os.getenv("LANGFUSE_FLUSH_INTERVAL", "5")),
     )
@@ -1,11 +1,51 @@
 """S3 module for handling file operations in AWS S3."""
 
+from __future__ import annotations
+
 import os
-from typing import List, Tuple
+from typing import TYPE_CHECKING, List, Tuple
 
 import boto3
+import streamlit as st
 from botocore.exceptions import ClientError
-from mypy_boto3_s3.client import S3Client
+
+if TYPE_CHECKING:
+    from mypy_boto3_s3.client import S3Client
+
+_BEDROCK_REGION = os.getenv("BEDROCK_REGION", "us-east-1")
+
+
+@st.cache_resource
+def _get_s3_client(region: str) -> S3Client:
+    """Get an S3 client shared across all sessions."""
+    return boto3.session.Session(region_name=region).client("s3", region_name=region)
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _list_files(_s3_client: S3Client, bucket_name: str) -> List[Tuple[str, int]]:
+    """List all files in the knowledge base directory of a bucket, cached for a minute."""
+    pages = _s3_client.get_paginator("list_objects_v2").paginate(Bucket=bucket_name, Prefix="knowledgeBase/")
+    files = [
+        (obj["Key"], obj["Size"])
+        for page in pages
+        for obj in page.get("Contents", [])
+        if obj.get("Key") and obj.get("Size") is not None
+    ]
+    return sorted(files)
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _generate_download_url(_s3_client: S3Client, bucket_name: str, file_key: str) -> str:
+    """Generate a presigned download URL, cached for 10 minutes.
+
+    The URL is signed with the task role's temporary credentials and stops working when they expire, even before
+    ExpiresIn has passed. botocore refreshes them about 15 minutes ahead of expiry, so the TTL stays below that window.
+    """
+    return _s3_client.generate_presigned_url(
+        "get_object",
+        Params={"Bucket": bucket_name, "Key": file_key},
+        ExpiresIn=3600,
+    )
 
 
 class S3Handler:
@@ -13,30 +53,19 @@ class S3Handler:
 
     def __init__(self) -> None:
         """Initialize the S3 handler with AWS configuration."""
-        self.session = boto3.session.Session(region_name=os.getenv("BEDROCK_REGION", "us-east-1"))
-        self.s3_client: S3Client = self.session.client("s3", region_name=os.getenv("BEDROCK_REGION", "us-east-1"))
+        self.s3_client: S3Client = _get_s3_client(_BEDROCK_REGION)
         self.bucket_name = os.getenv("RAG_BUCKET", "multi-agent-blueprint-bedrock-rag")
 
     def list_files(self) -> List[Tuple[str, int]]:
-        """List all files in the knowledge base directory."""
+        """List the files in the knowledge base directory in key order."""
         try:
-            response = self.s3_client.list_objects_v2(Bucket=self.bucket_name, Prefix="knowledgeBase/")
-            files = []
-            for obj in response.get("Contents", []):
-                if obj.get("Key") and obj.get("Size") is not None:
-                    files.append((obj["Key"], obj["Size"]))
-            return sorted(files)
+            return _list_files(self.s3_client, self.bucket_name)
         except ClientError:
             return []
 
     def get_download_url(self, file_key: str) -> str:
         """Generate a presigned URL for downloading a file."""
         try:
-            url = self.s3_client.generate_presigned_url(
-                "get_object",
-                Params={"Bucket": self.bucket_name, "Key": file_key},
-                ExpiresIn=3600,
-            )
-            return url
+            return _generate_download_url(self.s3_client, self.bucket_name, file_key)
         except ClientError:
             return ""
@@ -1,11 +1,28 @@
 """Session management for the application."""
 
 import uuid
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import streamlit as st
 from langfuse import Langfuse
 
+HISTORY_WINDOW_SIZE = 50
+
+
+def _default_state(session_id: str) -> Dict[str, Any]:
+    """Get fresh default values for all session state variables."""
+    return {
+        "message_roles": [],
+        "message_contents": [],
+        "message_trace_ids": [],
+        "feedback_states": {},
+        "uploaded_files": [],
+        "message_images": {},
+        "message_html": {},
+        "history_window_size": HISTORY_WINDOW_SIZE,
+        "session_id": session_id,
+    }
+
 
 class SessionManager:
     """Manages session state and interactions."""
@@ -14,19 +31,11 @@ class SessionManager:
         """Initialize the session manager."""
         self.langfuse = langfuse
 
-        # Initialize session state if needed
-        if "messages" not in st.session_state:
-            st.session_state.messages = []
-        if "feedback_states" not in st.session_state:
-            st.session_state.feedback_states = {}
-        if "uploaded_files" not in st.session_state:
-            st.session_state.uploaded_files = []
-        if "message_images" not in st.session_state:
-            st.session_state.message_images = {}
-        if "message_html" not in st.session_state:
-            st.session_state.message_html = {}
-        if "session_id" not in st.session_state:
-            st.session_state.session_id = session_id
+        # Initialize session state once per browser session
+        if "_session_initialized" not in st.session_state:
+            for key, value in _default_state(session_id).items():
+                st.session_state.setdefault(key, value)
+            st.session_state._session_initialized = True
 
     @property
     def session_id(self) -> str:
@@ -35,17 +44,44 @@ class SessionManager:
 
     @property
     def messages(self) -> List[Dict[str, Any]]:
-        """Get the chat messages."""
-        return st.session_state.messages
+        """Get the chat messages as a list of dictionaries."""
+        state = st.session_state
+        return [
+            {"role": role, "content": content, "trace_id": trace_id}
+            for role, content, trace_id in zip(state.message_roles, state.message_contents, state.message_trace_ids)
+        ]
+
+    @property
+    def visible_messages(self) -> Iterator[Tuple[str, str, Optional[str]]]:
+        """Get role, content and trace ID of the most recent chat messages that fit into the history window."""
+        state = st.session_state
+        start = -state.history_window_size
+        return zip(state.message_roles[start:], state.message_contents[start:], state.message_trace_ids[start:])
+
+    @property
+    def has_hidden_messages(self) -> bool:
+        """Check whether older chat messages are hidden by the history window."""
+        return len(st.session_state.message_roles) > st.session_state.history_window_size
+
+    def expand_history_window(self) -> None:
+        """Show another page of earlier chat messages."""
+        st.session_state.history_window_size += HISTORY_WINDOW_SIZE
 
     @property
     def uploaded_files(self) -> List[Any]:
         """Get the uploaded files."""
         return st.session_state.uploaded_files
 
+    def _append_message(self, role: str, content: str, trace_id: Optional[str]) -> None:
+        """Append a message to the parallel role, content and trace ID lists."""
+        state = st.session_state
+        state.message_roles.append(role)
+        state.message_contents.append(content)
+        state.message_trace_ids.append(trace_id)
+
     def add_user_message(self, content: str) -> None:
         """Add a user message to the chat history."""
-        st.session_state.messages.append({"role": "user", "content": content})
+        self._append_message("user", content, None)
 
     def add_assistant_message(
         self,
@@ -55,19 +91,16 @@ class SessionManager:
         html_files: Optional[List[Dict[str, Any]]] = None,
     ) -> None:
         """Add an assistant message to the chat history."""
-        st.session_state.messages.append({"role": "assistant", "content": content, "trace_id": trace_id})
+        self._append_message("assistant", content, trace_id)
         if images:
             st.session_state.message_images[trace_id] = images
         if html_files:
             st.session_state.message_html[trace_id] = html_files
 
-    def get_message_images(self, trace_id: str) -> List[Dict[str, Any]]:
-        """Get images associated with a message."""
-        return st.session_state.message_images.get(trace_id, [])
-
-    def get_message_html(self, trace_id: str) -> List[Dict[str, Any]]:
-        """Get HTML files associated with a message."""
-        return st.session_state.message_html.get(trace_id, [])
+    def get_assistant_attachments(self, trace_id: str) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Get the images and HTML files associated with a message in a single lookup."""
+        state = st.session_state
+        return state.message_images.get(trace_id, []), state.message_html.get(trace_id, [])
 
     def create_trace(self, user_id: str, input_text: str) -> str:
         """Create a new trace for the current interaction."""
@@ -92,9 +125,4 @@ class SessionManager:
 
     def reset(self) -> None:
         """Reset all session state variables."""
-        st.session_state.messages = []
-        st.session_state.feedback_states = {}
-        st.session_state.uploaded_files = []
-        st.session_state.message_images = {}
-        st.session_state.message_html = {}
-        st.session_state.session_id = str(uuid.uuid4())
+        st.session_state.update(_default_state(str(uuid.uuid4())))
@@ -1,26 +1,30 @@
-from typing import Dict, List, Optional
+from dataclasses import dataclass
+from typing import Annotated, Dict, List, Optional
 
 from pydantic import BaseModel, Field
+from typing_extensions import TypedDict
 
 
-class LocationContact(BaseModel):
-    name: Optional[str] = Field(None, description="Contact name and degree")
-    role: Optional[str] = Field(None, description="Contact role/investigator type")
-    phone: Optional[str] = Field(None, description="Contact phone number")
-    phone_ext: Optional[str] = Field(None, description="Phone extension")
-    email: Optional[str] = Field(None, description="Contact email")
+@dataclass(slots=True)
+class LocationContact:
+    name: Annotated[Optional[str], Field(description="Contact name and degree")] = None
+    role: Annotated[Optional[str], Field(description="Contact role/investigator type")] = None
+    phone: Annotated[Optional[str], Field(description="Contact phone number")] = None
+    phone_ext: Annotated[Optional[str], Field(description="Phone extension")] = None
+    email: Annotated[Optional[str], Field(description="Contact email")] = None
 
 
-class Location(BaseModel):
-    facility: Optional[str] = Field(None, description="Facility name")
-    status: Optional[str] = Field(None, description="Individual site recruitment status")
-    city: Optional[str] = Field(None, description="City")
-    state: Optional[str] = Field(None, description="State/Province")
-    zip: Optional[str] = Field(None, description="ZIP/Postal code")
-    country: Optional[str] = Field(None, description="Country")
-    country_code: Optional[str] = Field(None, description="ISO country code")
-    contacts: Optional[List[LocationContact]] = Field(None, description="Facility contacts")
-    geo_point: Optional[Dict[str, float]] = Field(None, description="Geographical coordinates")
+@dataclass(slots=True)
+class Location:
+    facility: Annotated[Optional[str], Field(description="Facility name")] = None
+    status: Annotated[Optional[str], Field(description="Individual site recruitment status")] = None
+    city: Annotated[Optional[str], Field(description="City")] = None
+    state: Annotated[Optional[str], Field(description="State/Province")] = None
+    zip: Annotated[Optional[str], Field(description="ZIP/Postal code")] = None
+    country: Annotated[Optional[str], Field(description="Country")] = None
+    country_code: Annotated[Optional[str], Field(description="ISO country code")] = None
+    contacts: Annotated[Optional[List[LocationContact]], Field(description="Facility contacts")] = None
+    geo_point: Annotated[Optional[Dict[str, float]], Field(description="Geographical coordinates")] = None
 
 
 class ClinicalTrial(BaseModel):
@@ -28,7 +32,7 @@ class ClinicalTrial(BaseModel):
     phase: Optional[str] = Field(None, description="Phase of the clinical trial")
     org_study_id: Optional[str] = Field(None, description="Organization's unique study identifier")
     status: Optional[str] = Field(None, description="Current recruitment status")
-    condition: Optional[str] = Field(None, description="Conditions under study")
+    conditions: Optional[List[str]] = Field(None, description="Conditions under study")
     completion_date: Optional[str] = Field(None, description="Primary completion date")
     enrollment_count: Optional[int] = Field(None, description="Number of participants enrolled")
     study_type: Optional[str] = Field(None, description="Type of study")
@@ -36,16 +40,16 @@ class ClinicalTrial(BaseModel):
     drug: Optional[str] = Field(None, description="Intervention name")
     study_population: Optional[str] = Field(None, description="Description of study population")
     sponsor: Optional[str] = Field(None, description="Lead sponsor name")
-    collaborator: Optional[str] = Field(None, description="Study collaborators")
+    collaborators: Optional[List[str]] = Field(None, description="Study collaborators")
     start_date: Optional[str] = Field(None, description="Study start date")
     primary_measure: Optional[str] = Field(None, description="Primary outcome measure")
     purpose: Optional[str] = Field(None, description="Primary purpose of the study")
     brief_title: Optional[str] = Field(None, description="Brief title of the study")
 
 
-class MinimalClinicalTrial(BaseModel):
-    nct_id: str = Field(..., description="The NCT ID / ClinicalTrials.gov identifier of the trial")
-    brief_title: str = Field(..., description="Brief title of the study")
+class MinimalClinicalTrial(TypedDict):
+    nct_id: Annotated[str, Field(description="The NCT ID / ClinicalTrials.gov identifier of the trial")]
+    brief_title: Annotated[str, Field(description="Brief title of the study")]
 
 
 class NearbyTrial(BaseModel):
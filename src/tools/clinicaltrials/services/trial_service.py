@@ -1,4 +1,5 @@
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List, Optional
 
 from aws_lambda_powertools import Logger
@@ -19,6 +20,14 @@ logger = Logger()
 
 BASE_URL = "https://clinicaltrials.gov/api/v2/studies"
 MAX_TRIALS = 100
+MAX_PAGE_SIZE = 1000
+MAX_WORKERS = 10
+
+_EXCL_SPLIT = re.compile(r"\b(?:Exclusion\s+Criteria:?)\b", re.IGNORECASE)
+_EXCL_HDR_SPLIT = re.compile(r"(?i)(?:^|\n)\s*exclusion criteria\s*[:|-]?")
+_NL_SPLIT = re.compile(r"\r?\n+")
+_INCL_HDR = re.compile(r"inclusion\s+criteria:?", re.IGNORECASE)
+_BULLET_CHARS = "-•*"
 
 
 def search_trials(
@@ -31,7 +40,7 @@ def search_trials(
         "protocolSection.identificationModule.nctId",
         "protocolSection.identificationModule.briefTitle",
     ]
-    params = {"format": "json", "fields": ",".join(fields), "pageSize": MAX_TRIALS, "countTotal": "true"}
+    params = {"format": "json", "fields": ",".join(fields), "pageSize": min(MAX_TRIALS, MAX_PAGE_SIZE)}
 
     logger.info("Constructing query...")
     if disease_area:
@@ -46,7 +55,7 @@ def search_trials(
 
     all_studies = []
     next_page_token = None
-    while True:
+    while len(all_studies) < MAX_TRIALS:
         try:
             if next_page_token:
                 params["pageToken"] = next_page_token
@@ -65,7 +74,7 @@ def search_trials(
             all_studies.extend(studies)
             logger.info(f"Retrieved {len(studies)} studies. Total so far: {len(all_studies)}")
             next_page_token = response_data.get("nextPageToken")
-            if not next_page_token or len(all_studies) >= MAX_TRIALS:
+            if not next_page_token:
                 break
 
         except Exception as e:
@@ -73,12 +82,14 @@ def search_trials(
             break
 
     trials_list = []
-    for study in all_studies:
+    for study in all_studies[:MAX_TRIALS]:
         try:
-            trial_info = MinimalClinicalTrial(
-                nct_id=get_nested_value(study, ["protocolSection", "identificationModule", "nctId"]),
-                brief_title=get_nested_value(study, ["protocolSection", "identificationModule", "briefTitle"]),
-            )
+            nct_id = get_nested_value(study, ("protocolSection", "identificationModule", "nctId"))
+            brief_title = get_nested_value(study, ("protocolSection", "identificationModule", "briefTitle"))
+            if not isinstance(nct_id, str) or not isinstance(brief_title, str):
+                raise ValueError("Missing NCT ID or brief title")
+
+            trial_info = MinimalClinicalTrial(nct_id=nct_id, brief_title=brief_title)
             trials_list.append(trial_info)
 
         except Exception as e:
@@ -124,26 +135,26 @@ def get_trial_details(nct_id: str) -> ClinicalTrial:
 
     study = studies[0]
     try:
-        return ClinicalTrial(
-            nct_id=get_nested_value(study, ["protocolSection", "identificationModule", "nctId"]),
-            phase=get_first_item(study, ["protocolSection", "designModule", "phases"]),
-            org_study_id=get_nested_value(study, ["protocolSection", "identificationModule", "orgStudyIdInfo", "id"]),
-            status=get_nested_value(study, ["protocolSection", "statusModule", "overallStatus"]),
-            condition="|".join(get_nested_value(study, ["protocolSection", "conditionsModule", "conditions"], [])),
+        return ClinicalTrial.model_construct(
+            nct_id=get_nested_value(study, ("protocolSection", "identificationModule", "nctId")),
+            phase=get_first_item(study, ("protocolSection", "designModule", "phases")),
+            org_study_id=get_nested_value(study, ("protocolSection", "identificationModule", "orgStudyIdInfo", "id")),
+            status=get_nested_value(study, ("protocolSection", "statusModule", "overallStatus")),
+            conditions=get_nested_value(study, ("protocolSection", "conditionsModule", "conditions"), []),
             completion_date=get_nested_value(
-                study, ["protocolSection", "statusModule", "primaryCompletionDateStruct", "date"]
+                study, ("protocolSection", "statusModule", "primaryCompletionDateStruct", "date")
             ),
-            enrollment_count=get_nested_value(study, ["protocolSection", "designModule", "enrollmentInfo", "count"]),
-            study_type=get_nested_value(study, ["protocolSection", "designModule", "studyType"]),
-            arm=get_first_item(study, ["protocolSection", "armsInterventionsModule", "armGroups"], "label"),
-            drug=get_first_item(study, ["protocolSection", "armsInterventionsModule", "interventions"], "name"),
-            study_population=get_nested_value(study, ["protocolSection", "eligibilityModule", "studyPopulation"]),
-            sponsor=get_nested_value(study, ["protocolSection", "sponsorCollaboratorsModule", "leadSponsor", "name"]),
-            collaborator=get_collaborators(study),
-            start_date=get_nested_value(study, ["protocolSection", "statusModule", "startDateStruct", "date"]),
-            primary_measure=get_first_item(study, ["protocolSection", "outcomesModule", "primaryOutcomes"], "measure"),
-            purpose=get_nested_value(study, ["protocolSection", "designModule", "designInfo", "primaryPurpose"]),
-            brief_title=get_nested_value(study, ["protocolSection", "identificationModule", "briefTitle"]),
+            enrollment_count=get_nested_value(study, ("protocolSection", "designModule", "enrollmentInfo", "count")),
+            study_type=get_nested_value(study, ("protocolSection", "designModule", "studyType")),
+            arm=get_first_item(study, ("protocolSection", "armsInterventionsModule", "armGroups"), "label"),
+            drug=get_first_item(study, ("protocolSection", "armsInterventionsModule", "interventions"), "name"),
+            study_population=get_nested_value(study, ("protocolSection", "eligibilityModule", "studyPopulation")),
+            sponsor=get_nested_value(study, ("protocolSection", "sponsorCollaboratorsModule", "leadSponsor", "name")),
+            collaborators=get_collaborators(study),
+            start_date=get_nested_value(study, ("protocolSection", "statusModule", "startDateStruct", "date")),
+            primary_measure=get_first_item(study, ("protocolSection", "outcomesModule", "primaryOutcomes"), "measure"),
+            purpose=get_nested_value(study, ("protocolSection", "designModule", "designInfo", "primaryPurpose")),
+            brief_title=get_nested_value(study, ("protocolSection", "identificationModule", "briefTitle")),
         )
 
     except Exception as e:
@@ -170,6 +181,31 @@ def get_trial_locations(nct_id: str) -> List[Location]:
     return process_locations(study)
 
 
+def _find_nearby_trial(
+    nct_id: str, user_lat: float, user_lon: float, max_distance: Optional[float]
+) -> Optional[NearbyTrial]:
+    """Find the closest location of a single trial within the maximum distance."""
+    try:
+        locations = get_trial_locations(nct_id)
+        if not locations:
+            return None
+
+        result = calculate_closest_location(locations, user_lat, user_lon, max_distance)
+        if not result:
+            return None
+
+        distance, closest_loc = result
+        return NearbyTrial(
+            nct_id=nct_id,
+            distance_km=distance,
+            closest_location=closest_loc,
+        )
+
+    except Exception as e:
+        logger.error(f"Error processing trial {nct_id}: {str(e)}")
+        return None
+
+
 def get_closest_trials(
     nct_ids: List[str],
     city: Optional[str] = None,
@@ -182,57 +218,50 @@ def get_closest_trials(
     user_lat, user_lon = geocode_address(city, state, zip_code, country)
     nearby_trials = []
 
-    for nct_id in nct_ids:
-        try:
-            nct_id = nct_id.strip()
-            locations = get_trial_locations(nct_id)
-
-            if not locations:
-                continue
-
-            result = calculate_closest_location(locations, user_lat, user_lon, max_distance)
-            if result:
-                distance, closest_loc = result
-                nearby_trials.append(
-                    NearbyTrial(
-                        nct_id=nct_id,
-                        distance_km=distance,
-                        closest_location=closest_loc,
-                    )
-                )
-
-        except Exception as e:
-            logger.error(f"Error processing trial {nct_id}: {str(e)}")
-            continue
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = [
+            executor.submit(_find_nearby_trial, nct_id.strip(), user_lat, user_lon, max_distance) for nct_id in nct_ids
+        ]
+        for future in as_completed(futures):
+            if nearby_trial := future.result():
+                nearby_trials.append(nearby_trial)
 
     return sorted(nearby_trials, key=lambda x: x.distance_km)
 
 
-def get_inclusion_criteria(nct_id: str) -> Optional[str]:
+def _strip_bullet(line: str) -> str:
+    """Strip surrounding whitespace and a single leading bullet marker from a criteria line."""
+    line = line.strip()
+    if line and line[0] in _BULLET_CHARS:
+        line = line[1:].lstrip()
+    return line
+
+
+def _get_eligibility_criteria(nct_id: str) -> Optional[str]:
+    """Fetch the eligibility criteria text, inclusion and exclusion share the same cached request."""
     params = {"format": "json", "fields": "protocolSection.eligibilityModule.eligibilityCriteria", "query.id": nct_id}
+    response = fetch(url=BASE_URL, params=params)
+    if not response or not response.get("studies"):
+        logger.error(f"No data found for Trial NCT ID: {nct_id}")
+        return None
+
+    return response["studies"][0]["protocolSection"]["eligibilityModule"]["eligibilityCriteria"]
+
+
+def get_inclusion_criteria(nct_id: str) -> Optional[str]:
     try:
-        response = fetch(url=BASE_URL, params=params)
-        if not response or not response.get("studies"):
-            logger.error(f"No data found for Trial NCT ID: {nct_id}")
+        eligibility_criteria = _get_eligibility_criteria(nct_id)
+        if eligibility_criteria is None:
             return None
 
-        eligibility_criteria = response["studies"][0]["protocolSection"]["eligibilityModule"]["eligibilityCriteria"]
-        inclusion_criteria = re.split(r"\b(?:Exclusion\s+Criteria:?)\b", eligibility_criteria, flags=re.IGNORECASE)[
-            0
-        ].strip()
-        inclusions = re.split(r"\r?\n+", inclusion_criteria)
+        inclusion_criteria = _EXCL_SPLIT.split(eligibility_criteria)[0].strip()
+        inclusions = _NL_SPLIT.split(inclusion_criteria)
 
         cleaned_inclusions = []
         for inclusion in inclusions:
-            inclusion = inclusion.strip()
-            if (
-                inclusion
-                and not re.search(r"^\s*inclusion\s+criteria:?\s*$", inclusion, flags=re.IGNORECASE)
-                and not re.search(r"^\s*[-•*]\s*$", inclusion)
-            ):
-                inclusion = re.sub(r"^\s*[-•*]\s*", "", inclusion)
-                if inclusion:
-                    cleaned_inclusions.append(inclusion)
+            inclusion = _strip_bullet(inclusion)
+            if inclusion and not _INCL_HDR.fullmatch(inclusion):
+                cleaned_inclusions.append(inclusion)
 
         formatted_inclusions = []
         for i, inclusion in enumerate(cleaned_inclusions, 1):
@@ -248,37 +277,27 @@ def get_inclusion_criteria(nct_id: str) -> Optional[str]:
 
 
 def get_exclusion_criteria(nct_id: str) -> Optional[str]:
-    params = {"format": "json", "fields": "protocolSection.eligibilityModule.eligibilityCriteria", "query.id": nct_id}
-
     try:
-        response = fetch(url=BASE_URL, params=params)
-        if not response or not response.get("studies"):
-            logger.error(f"No data found for Trial NCT ID: {nct_id}")
+        eligibility_criteria = _get_eligibility_criteria(nct_id)
+        if eligibility_criteria is None:
             return None
 
-        eligibility_criteria = response["studies"][0]["protocolSection"]["eligibilityModule"]["eligibilityCriteria"]
         try:
-            exclusion_criteria = re.split(r"\b(?:Exclusion\s+Criteria:?)\b", eligibility_criteria, flags=re.IGNORECASE)[
-                1
-            ].strip()
+            exclusion_criteria = _EXCL_SPLIT.split(eligibility_criteria)[1].strip()
         except IndexError:
             try:
-                exclusion_criteria = re.split(r"(?i)(?:^|\n)\s*exclusion criteria\s*[:|-]?", eligibility_criteria)[
-                    1
-                ].strip()
+                exclusion_criteria = _EXCL_HDR_SPLIT.split(eligibility_criteria)[1].strip()
             except IndexError:
                 logger.error(f"Could not find exclusion criteria section for Trial NCT ID: {nct_id}")
                 return None
 
-        exclusions = re.split(r"\r?\n+", exclusion_criteria)
+        exclusions = _NL_SPLIT.split(exclusion_criteria)
 
         cleaned_exclusions = []
         for exclusion in exclusions:
-            exclusion = exclusion.strip()
-            if exclusion and not re.search(r"^\s*$", exclusion) and not re.search(r"^\s*[-•*]\s*$", exclusion):
-                exclusion = re.sub(r"^\s*[-•*]\s*", "", exclusion)
-                if exclusion:
-                    cleaned_exclusions.append(exclusion)
+            exclusion = _strip_bullet(exclusion)
+            if exclusion:
+                cleaned_exclusions.append(exclusion)
 
         formatted_exclusions = []
         for i, exclusion in enumerate(cleaned_exclusions, 1):
@@ -0,0 +1,29 @@
+from unittest import mock
+
+import orjson
+import pytest
+from utils import helpers
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    helpers._fetch_cached.cache_clear()
+    helpers._geocode.cache_clear()
+    yield
+    helpers._fetch_cached.cache_clear()
+    helpers._geocode.cache_clear()
+
+
+@pytest.fixture
+def make_response():
+    def _make_response(body, status_code: int = 200) -> mock.Mock:
+        content = body if isinstance(body, bytes) else orjson.dumps(body)
+        return mock.Mock(status_code=status_code, content=content, text=content.decode("utf-8", "replace"))
+
+    return _make_response
+
+
+@pytest.fixture
+def session_get():
+    with mock.patch.object(helpers._SESSION, "get") as get:
+        yield get
@@ -0,0 +1,41 @@
+import importlib.util
+import json
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def lambda_app():
+    # Load by path, the Streamlit app module is also named app on the configured pythonpath
+    spec = importlib.util.spec_from_file_location("clinicaltrials_app", Path(__file__).parents[1] / "app.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.app
+
+
+@pytest.mark.unit
+def test_search_trials_route_returns_json_objects(lambda_app, session_get, make_response):
+    session_get.return_value = make_response(
+        {"studies": [{"protocolSection": {"identificationModule": {"nctId": "NCT00000001", "briefTitle": "Trial"}}}]}
+    )
+    event = {
+        "messageVersion": "1.0",
+        "agent": {"name": "agent", "id": "id", "alias": "alias", "version": "1"},
+        "inputText": "",
+        "sessionId": "session",
+        "actionGroup": "clinicaltrials",
+        "apiPath": "/search_trials",
+        "httpMethod": "GET",
+        "parameters": [{"name": "disease_area", "type": "string", "value": "lung cancer"}],
+        "sessionAttributes": {},
+        "promptSessionAttributes": {},
+    }
+
+    response = lambda_app.resolve(event, mock.Mock())["response"]
+
+    assert response["httpStatusCode"] == 200
+    assert json.loads(response["responseBody"]["application/json"]["body"]) == [
+        {"nct_id": "NCT00000001", "brief_title": "Trial"}
+    ]
@@ -0,0 +1,120 @@
+import math
+import random
+from typing import List, Optional, Tuple
+
+import pytest
+from models.trial import Location
+from utils import helpers
+from utils.helpers import EARTH_RADIUS_KM, calculate_closest_location, fetch
+
+
+def _haversine_scan(
+    locations: List[Location], user_lat: float, user_lon: float, max_distance: Optional[float]
+) -> Optional[Tuple[float, Location]]:
+    """Reference implementation without the bounding-box prefilter."""
+    closest = None
+    for location in locations:
+        lat1, lat2 = math.radians(user_lat), math.radians(location.geo_point["lat"])
+        a = (
+            math.sin((lat2 - lat1) / 2) ** 2
+            + math.cos(lat1) * math.cos(lat2) * math.sin(math.radians(location.geo_point["lon"] - user_lon) / 2) ** 2
+        )
+        distance = 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0)))
+        if closest is None or distance < closest[0]:
+            closest = (distance, location)
+
+    if closest and (max_distance is None or closest[0] <= max_distance):
+        return closest
+    return None
+
+
+def _assert_same_result(actual, expected) -> None:
+    if expected is None:
+        assert actual is None
+    else:
+        assert actual is not None
+        assert actual[1] is expected[1]
+        assert actual[0] == pytest.approx(expected[0], abs=1e-6)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("max_distance", [None, 50, 500, 3000, 15000])
+def test_closest_location_matches_full_haversine_scan(max_distance):
+    rng = random.Random(42)
+    for _ in range(1000):
+        user_lat = rng.uniform(-89.9, 89.9)
+        user_lon = rng.uniform(-180, 180)
+        locations = [
+            Location(
+                geo_point={
+                    "lat": max(-90.0, min(90.0, user_lat + rng.gauss(0, 8))),
+                    "lon": (user_lon + rng.gauss(0, 12) + 180) % 360 - 180,
+                }
+            )
+            for _ in range(20)
+        ]
+
+        _assert_same_result(
+            calculate_closest_location(locations, user_lat, user_lon, max_distance),
+            _haversine_scan(locations, user_lat, user_lon, max_distance),
+        )
+
+
+@pytest.mark.unit
+def test_closest_location_across_antimeridian():
+    nearby = Location(city="Suva", geo_point={"lat": -18.1, "lon": -179.9})
+    far = Location(city="Auckland", geo_point={"lat": -36.8, "lon": 174.8})
+
+    result = calculate_closest_location([far, nearby], -18.1, 179.9, max_distance=100)
+
+    assert result is not None
+    assert result[1] is nearby
+    assert result[0] < 100
+
+
+@pytest.mark.unit
+def test_closest_location_near_pole():
+    # Same latitude, opposite side of the pole: only 200 km apart despite a 180 degree longitude difference
+    opposite = Location(city="Opposite", geo_point={"lat": 89.1, "lon": 180.0})
+
+    result = calculate_closest_location([opposite], 89.1, 0.0, max_distance=500)
+
+    assert result is not None
+    assert result[1] is opposite
+    assert result[0] == pytest.approx(200, rel=0.01)
+
+
+@pytest.mark.unit
+def test_closest_location_outside_max_distance():
+    location = Location(geo_point={"lat": 40.71, "lon": -74.0})
+
+    assert calculate_closest_location([location], 41.88, -87.63, max_distance=500) is None
+    assert calculate_closest_location([Location(), location], 41.88, -87.63) is not None
+
+
+@pytest.mark.unit
+def test_fetch_caches_successful_responses(session_get, make_response):
+    session_get.return_value = make_response({"studies": []})
+
+    assert fetch("https://example.com", {"b": 1, "a": "x"}) == {"studies": []}
+    assert fetch("https://example.com", {"a": "x", "b": 1}) == {"studies": []}
+    assert session_get.call_count == 1
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    ("body", "status_code"),
+    [
+        ({"error": "unavailable"}, 503),
+        (["not", "a", "dict"], 200),
+        (b"not json", 200),
+    ],
+    ids=["non-200", "non-dict", "invalid-json"],
+)
+def test_fetch_does_not_cache_failures(session_get, make_response, body, status_code):
+    session_get.return_value = make_response(body, status_code=status_code)
+
+    assert fetch("https://example.com", {"a": 1}) is None
+    assert fetch("https://example.com", {"a": 1}) is None
+    assert session_get.call_count == 2
+    assert helpers._fetch_cached.cache_info().currsize == 0
@@ -0,0 +1,81 @@
+import pytest
+from services import trial_service
+
+ELIGIBILITY_CRITERIA = (
+    "Inclusion Criteria:\n\n* Adults aged 18 or older\n- Signed informed consent\n\n"
+    "Exclusion Criteria\n\n* Pregnancy\n*\n* Prior therapy."
+)
+
+
+@pytest.fixture
+def eligibility_response(session_get, make_response):
+    session_get.return_value = make_response(
+        {"studies": [{"protocolSection": {"eligibilityModule": {"eligibilityCriteria": ELIGIBILITY_CRITERIA}}}]}
+    )
+    return session_get
+
+
+@pytest.mark.unit
+def test_inclusion_and_exclusion_share_one_request(eligibility_response):
+    assert trial_service.get_inclusion_criteria("NCT00000001") == (
+        "1. Adults aged 18 or older.\n2. Signed informed consent."
+    )
+    assert trial_service.get_exclusion_criteria("NCT00000001") == "1. Pregnancy.\n2. Prior therapy."
+    assert eligibility_response.call_count == 1
+
+
+@pytest.mark.unit
+def test_eligibility_criteria_not_found(session_get, make_response):
+    session_get.return_value = make_response({"studies": []})
+
+    assert trial_service.get_inclusion_criteria("NCT00000001") is None
+    assert trial_service.get_exclusion_criteria("NCT00000001") is None
+
+
+def _studies(start: int, count: int):
+    return [
+        {"protocolSection": {"identificationModule": {"nctId": f"NCT{i:08d}", "briefTitle": f"Trial {i}"}}}
+        for i in range(start, start + count)
+    ]
+
+
+@pytest.mark.unit
+def test_search_trials_requests_one_capped_page(session_get, make_response):
+    session_get.return_value = make_response(
+        {"studies": _studies(0, trial_service.MAX_TRIALS), "nextPageToken": "next"}
+    )
+
+    trials = trial_service.search_trials(disease_area="lung cancer")
+
+    assert session_get.call_count == 1
+    params = session_get.call_args.kwargs["params"]
+    assert params["pageSize"] == min(trial_service.MAX_TRIALS, trial_service.MAX_PAGE_SIZE)
+    assert "countTotal" not in params
+    assert params["query.cond"] == "lung+cancer"
+    assert len(trials) == trial_service.MAX_TRIALS
+    assert trials[0] == {"nct_id": "NCT00000000", "brief_title": "Trial 0"}
+
+
+@pytest.mark.unit
+def test_search_trials_follows_page_tokens_up_to_the_cap(session_get, make_response):
+    page_size = trial_service.MAX_TRIALS - 10
+    session_get.side_effect = [
+        make_response({"studies": _studies(0, page_size), "nextPageToken": "page-2"}),
+        make_response({"studies": _studies(page_size, page_size), "nextPageToken": "page-3"}),
+    ]
+
+    trials = trial_service.search_trials()
+
+    assert session_get.call_count == 2
+    assert session_get.call_args.kwargs["params"]["pageToken"] == "page-2"
+    assert len(trials) == trial_service.MAX_TRIALS
+    assert trials[-1]["nct_id"] == f"NCT{trial_service.MAX_TRIALS - 1:08d}"
+
+
+@pytest.mark.unit
+def test_search_trials_skips_studies_without_title(session_get, make_response):
+    studies = _studies(0, 2)
+    del studies[1]["protocolSection"]["identificationModule"]["briefTitle"]
+    session_get.return_value = make_response({"studies": studies})
+
+    assert trial_service.search_trials() == [{"nct_id": "NCT00000000", "brief_title": "Trial 0"}]
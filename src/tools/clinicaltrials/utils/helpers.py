@@ -1,57 +1,81 @@
+import math
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Tuple
 
+import orjson
 import requests
 from aws_lambda_powertools import Logger
 from aws_lambda_powertools.event_handler.exceptions import (
     BadRequestError,
     InternalServerError,
 )
-from geopy.distance import geodesic
 from geopy.exc import GeocoderTimedOut, GeocoderUnavailable
 from geopy.geocoders import Nominatim
 from models.trial import Location, LocationContact
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 logger = Logger()
 
 MAX_RESPONSE_SIZE = 24 * 1024  # 24KB limit for responses
+EARTH_RADIUS_KM = 6371.0088
+
+# Shared session to reuse TCP+TLS connections across requests and warm Lambda invocations
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=20,
+        max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[429, 500, 502, 503, 504]),
+    ),
+)
+
+# Shared geocoder so its HTTP adapter and connection pool are reused across lookups
+_GEOLOCATOR = Nominatim(user_agent="clinical_trials_app", timeout=5)
 
 
 def fetch(url: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Fetch a JSON object from the API, responses are cached per URL and parameters and must not be mutated."""
     try:
-        with requests.get(url, params=params) as response:
-            if response.status_code == 200:
-                text = response.text
-                try:
-                    data = requests.get(url, params=params).json()
-                    if isinstance(data, dict):
-                        return data
-                    logger.error("API response is not a dictionary")
-                    return None
-                except requests.exceptions.JSONDecodeError as e:
-                    logger.error(f"Failed to decode JSON: {text[:200]}...")
-                    raise
-            else:
-                logger.error(f"HTTP Error: {response.status_code}")
-                logger.error(f"Response text: {response.text}")
-                return None
+        return _fetch_cached(url, tuple(sorted(params.items())))
     except Exception as e:
         logger.error(f"Error in fetch: {str(e)}")
         return None
 
 
-def get_nested_value(obj: Dict[str, Any], path: List[str], default: Any = None) -> Any:
+@lru_cache(maxsize=512)
+def _fetch_cached(url: str, params: Tuple[Tuple[str, Any], ...]) -> Dict[str, Any]:
+    # Failures raise instead of returning None so that they are never cached
+    response = _SESSION.get(url, params=dict(params), timeout=10)
+    if response.status_code != 200:
+        logger.error(f"Response text: {response.text}")
+        raise requests.HTTPError(f"HTTP Error: {response.status_code}")
+
+    try:
+        data = orjson.loads(response.content)
+    except orjson.JSONDecodeError:
+        logger.error(f"Failed to decode JSON: {response.text[:200]}...")
+        raise
+
+    if not isinstance(data, dict):
+        raise TypeError("API response is not a dictionary")
+    return data
+
+
+def get_nested_value(obj: Dict[str, Any], path: Tuple[str, ...], default: Any = None) -> Any:
     try:
         current: Any = obj
         for key in path:
+            current = current.get(key)
             if current is None:
                 return default
-            current = current.get(key)
-        return current if current is not None else default
+        return current
     except (KeyError, TypeError, AttributeError):
         return default
 
 
-def get_first_item(obj: Dict[str, Any], path: List[str], field: Optional[str] = None) -> Any:
+def get_first_item(obj: Dict[str, Any], path: Tuple[str, ...], field: Optional[str] = None) -> Any:
     try:
         items = get_nested_value(obj, path, [])
         if items and isinstance(items, list):
@@ -63,24 +87,25 @@ def get_first_item(obj: Dict[str, Any], path: List[str], field: Optional[str] =
         return None
 
 
-def get_collaborators(study: Dict[str, Any]) -> Optional[str]:
+def get_collaborators(study: Dict[str, Any]) -> Optional[List[str]]:
     try:
-        collaborators = get_nested_value(study, ["protocolSection", "sponsorCollaboratorsModule", "collaborators"], [])
-        return "|".join(collab.get("name", "") for collab in collaborators if collab.get("name"))
+        collaborators = get_nested_value(study, ("protocolSection", "sponsorCollaboratorsModule", "collaborators"), [])
+        return [collab["name"] for collab in collaborators if collab.get("name")]
     except Exception:
         return None
 
 
 def truncate_response(text: str) -> str:
     """Truncate response to stay within size limit while maintaining readability."""
-    if not text or len(text.encode("utf-8")) <= MAX_RESPONSE_SIZE:
+    # A character takes at most 4 bytes in UTF-8, so short texts fit without encoding them
+    if not text or len(text) <= MAX_RESPONSE_SIZE // 4 or len(text.encode("utf-8")) <= MAX_RESPONSE_SIZE:
         return text
     lines = text.split("\n")
     result = []
     current_size = 0
 
     for line in lines:
-        line_size = len((line + "\n").encode("utf-8"))
+        line_size = len(line.encode("utf-8")) + 1
         if current_size + line_size > MAX_RESPONSE_SIZE:
             result.append("... (Response truncated due to size limit)")
             break
@@ -106,7 +131,7 @@ def process_location_contacts(contacts: List[Dict[str, Any]]) -> List[LocationCo
 
 
 def process_locations(study: Dict[str, Any]) -> List[Location]:
-    locations_data = get_nested_value(study, ["protocolSection", "contactsLocationsModule", "locations"], [])
+    locations_data = get_nested_value(study, ("protocolSection", "contactsLocationsModule", "locations"), [])
     if not locations_data:
         return []
 
@@ -119,7 +144,7 @@ def process_locations(study: Dict[str, Any]) -> List[Location]:
             zip=loc.get("zip"),
             country=loc.get("country"),
             country_code=loc.get("countryCode"),
-            contacts=process_location_contacts(loc.get("contacts", [])),
+            contacts=process_location_contacts(contacts) if (contacts := loc.get("contacts")) else [],
             geo_point=loc.get("geoPoint"),
         )
         for loc in locations_data
@@ -143,11 +168,14 @@ def geocode_address(
     if country:
         address_parts.append(country)
 
-    address = ", ".join(address_parts)
+    return _geocode(", ".join(address_parts))
 
+
+@lru_cache(maxsize=1024)
+def _geocode(address: str) -> Tuple[float, float]:
+    """Geocode an address, successful lookups are cached to respect Nominatim's rate limit."""
     try:
-        geolocator = Nominatim(user_agent="clinical_trials_app")
-        location = geolocator.geocode(address)
+        location = _GEOLOCATOR.geocode(address)
 
         if location is None:
             raise BadRequestError(f"Could not geocode address: {address}")
@@ -162,6 +190,18 @@ def calculate_closest_location(
     locations: List[Location], user_lat: float, user_lon: float, max_distance: Optional[float] = None
 ) -> Optional[Tuple[float, Location]]:
     """Calculate the closest location from a list of locations to the user's coordinates."""
+    user_lat_rad = math.radians(user_lat)
+    user_lon_rad = math.radians(user_lon)
+    cos_user_lat = math.cos(user_lat_rad)
+
+    # Bounding box of the max_distance circle, so sites that are clearly too far skip the haversine
+    max_dlat = max_dlon = 360.0
+    if max_distance is not None:
+        radius = max_distance / EARTH_RADIUS_KM
+        max_dlat = math.degrees(radius)
+        if radius < math.pi / 2 and math.sin(radius) < cos_user_lat:
+            max_dlon = math.degrees(math.asin(math.sin(radius) / cos_user_lat))
+
     closest_distance = float("inf")
     closest_loc = None
 
@@ -175,7 +215,17 @@ def calculate_closest_location(
         if loc_lat is None or loc_lon is None:
             continue
 
-        distance = geodesic((user_lat, user_lon), (loc_lat, loc_lon)).kilometers
+        dlon = abs(loc_lon - user_lon) % 360
+        if abs(loc_lat - user_lat) > max_dlat or min(dlon, 360 - dlon) > max_dlon:
+            continue
+
+        # Haversine distance, within 0.5% of the geodesic and enough to rank sites
+        loc_lat_rad = math.radians(loc_lat)
+        a = (
+            math.sin((loc_lat_rad - user_lat_rad) / 2) ** 2
+            + cos_user_lat * math.cos(loc_lat_rad) * math.sin((math.radians(loc_lon) - user_lon_rad) / 2) ** 2
+        )
+        distance = 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0)))
 
         if distance < closest_distance:
             closest_distance = distance